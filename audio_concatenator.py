@@ -1,81 +1,303 @@
 #!/usr/bin/env python3
 """
 Audio Concatenator Script
-Concatenates 4 audio files in customizable patterns using ffmpeg
+Concatenates 4 audio files in customizable patterns.
+WAV inputs are spliced directly in Python; anything else goes through ffmpeg.
 """
 
 import subprocess
 import os
 import sys
 import argparse
+import errno
+import mmap
+import re
+import struct
+import wave
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import repeat
 
 def get_audio_files(folder_path=None):
     """Get all available audio files from the specified folder or current directory"""
     base_name = "replicate-prediction-ey6ew4zgddrj40cqqkcr4xnt0m"
-    files = []
+    file_regex = re.compile(rf"^{re.escape(base_name)}-(0|[1-9]\d*)\.wav$")
+    
+    # One directory listing instead of a stat per candidate file
+    found = {}
+    try:
+        with os.scandir(folder_path or '.') as entries:
+            for entry in entries:
+                match = file_regex.match(entry.name)
+                if match:
+                    found[int(match.group(1))] = os.path.join(folder_path, entry.name) if folder_path else entry.name
+    except OSError as e:
+        raise ValueError(f"Cannot read folder '{folder_path or '.'}': {e.strerror}") from e
     
-    # Check for files 0-19 (supporting up to 20 variations)
+    # Take files 0-19 (supporting up to 20 variations)
+    files = []
     for i in range(20):
-        if folder_path:
-            filename = os.path.join(folder_path, f"{base_name}-{i}.wav")
-        else:
-            filename = f"{base_name}-{i}.wav"
-        
-        if os.path.exists(filename):
-            files.append(filename)
-        else:
+        if i not in found:
             break  # Stop at first missing file (assumes sequential naming)
+        files.append(found[i])
     
     if len(files) < 2:
-        print(f"Error: Need at least 2 files for concatenation, found {len(files)}")
-        sys.exit(1)
+        raise ValueError(f"Need at least 2 files for concatenation, found {len(files)}")
         
     return files
 
 def validate_pattern(pattern, num_files):
     """Validate that the pattern only contains valid letters for available files"""
     # Generate valid characters based on number of files (A, B, C, D, E, F, ...)
-    valid_chars = set(chr(65 + i) for i in range(num_files))  # A=65, B=66, etc.
-    pattern_chars = set(pattern.upper())
+    valid_chars = "".join(chr(65 + i) for i in range(num_files))  # A=65, B=66, etc.
+    pattern = pattern.upper()
     
-    if not pattern_chars.issubset(valid_chars):
-        invalid_chars = pattern_chars - valid_chars
-        available = ', '.join(sorted(valid_chars))
+    # Deleting every valid letter in one C-level pass leaves exactly the invalid ones
+    leftover = pattern.translate(str.maketrans('', '', valid_chars))
+    if leftover:
+        invalid_chars = set(leftover)
+        available = ', '.join(valid_chars)
         raise ValueError(f"Invalid characters in pattern: {invalid_chars}. Available letters: {available}")
     
-    return pattern.upper()
+    return pattern
+
+def create_concat_list(audio_files, pattern="AABBAACCDDAA"):
+    """Create the ffmpeg concat demuxer list, to be fed to ffmpeg on stdin"""
+    # Format each file's line once; the pattern is already validated, so every letter maps to a file.
+    # Absolute paths, since entries read from a pipe have no directory to be relative to
+    lines = {chr(65 + i): f"file '{os.path.abspath(audio_file)}'\n" for i, audio_file in enumerate(audio_files)}
+    concat_text = "".join([lines[char] for char in pattern])
+    
+    print(f"Created concat list with pattern: {pattern}")
+    
+    return concat_text
+
+WavLayout = namedtuple('WavLayout', ['fmt', 'data_offset', 'data_size'])
+
+def read_wav_layout(f):
+    """Locate the fmt and data chunks of an open RIFF/WAVE file
+    
+    Returns:
+        WavLayout of (fmt chunk body, data chunk offset, data chunk size in whole frames)
+    """
+    header = f.read(12)
+    if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+        raise wave.Error("file does not start with a RIFF/WAVE header")
+    
+    fmt = None
+    while True:
+        chunk_header = f.read(8)
+        if len(chunk_header) < 8:
+            raise wave.Error("no fmt or data chunk found")
+        chunk_id, chunk_size = chunk_header[:4], struct.unpack('<I', chunk_header[4:])[0]
+        
+        if chunk_id == b'fmt ':
+            fmt = f.read(chunk_size)
+            if len(fmt) < 16:
+                raise wave.Error("fmt chunk is too short")
+            f.seek(chunk_size & 1, os.SEEK_CUR)  # Chunks are word aligned
+        elif chunk_id == b'data':
+            if fmt is None:
+                raise wave.Error("data chunk comes before the fmt chunk")
+            data_offset = f.tell()
+            # Clamp to the real file size (streamed WAVs may carry a placeholder size)
+            data_size = min(chunk_size, os.fstat(f.fileno()).st_size - data_offset)
+            block_align = struct.unpack('<H', fmt[12:14])[0] or 1
+            return WavLayout(fmt, data_offset, data_size - data_size % block_align)
+        else:
+            f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+
+def wav_format_key(fmt):
+    """Get the fields of a fmt chunk that decide whether data chunks can be joined
+    
+    Returns:
+        Tuple of (format tag, channels, sample rate, block align, bits per sample, sub-format GUID or None)
+    """
+    format_tag, channels, sample_rate, _, block_align, bits = struct.unpack('<HHIIHH', fmt[:16])
+    # WAVE_FORMAT_EXTENSIBLE keeps the real format in a GUID after the basic fields
+    sub_format = fmt[24:40] if format_tag == 0xFFFE else None
+    return format_tag, channels, sample_rate, block_align, bits, sub_format
+
+def describe_wav_format(fmt):
+    """Describe a fmt chunk as e.g. '2 ch, 16 bit, 32000 Hz'"""
+    format_tag, channels, sample_rate, _, bits, sub_format = wav_format_key(fmt)
+    # IEEE float, directly or as the sub-format of WAVE_FORMAT_EXTENSIBLE
+    is_float = format_tag == 3 or (sub_format is not None and sub_format[:2] == b'\x03\x00')
+    return f"{channels} ch, {bits} bit{' float' if is_float else ''}, {sample_rate} Hz"
+
+def wav_duration(fmt, data_size):
+    """Get the duration in seconds of data_size bytes of audio in the given format"""
+    byte_rate = struct.unpack('<I', fmt[8:12])[0]
+    return data_size / byte_rate
+
+def create_wav_header(fmt, data_size):
+    """Build the RIFF header, fmt chunk and data chunk header for a WAV with data_size bytes of audio"""
+    fmt_chunk = b'fmt ' + struct.pack('<I', len(fmt)) + fmt + b'\0' * (len(fmt) & 1)
+    riff_size = 4 + len(fmt_chunk) + 8 + data_size + (data_size & 1)
+    if riff_size > 0xFFFFFFFF:
+        raise ValueError("Output would exceed the 4 GiB WAV size limit")
+    return b'RIFF' + struct.pack('<I', riff_size) + b'WAVE' + fmt_chunk + b'data' + struct.pack('<I', data_size)
+
+def read_wav_layouts(audio_files):
+    """Parse the WAV layout of every file and check that they all share one format
+    
+    Returns:
+        Tuple of WavLayout per file, or None if some file is not a WAV (ffmpeg has to handle those)
+    """
+    layouts = []
+    for audio_file in audio_files:
+        try:
+            with open(audio_file, 'rb') as f:
+                layouts.append(read_wav_layout(f))
+        except wave.Error as e:
+            print(f"{os.path.basename(audio_file)} is not a WAV file that can be spliced ({e}), ffmpeg will be used")
+            return None
+        except OSError as e:
+            raise ValueError(f"Cannot read {os.path.basename(audio_file)}: {e.strerror}") from e
+    
+    # Data chunks can only be spliced (or stream-copied by ffmpeg) if every file decodes to the same format;
+    # the fmt chunks themselves may still differ in layout (e.g. an 18-byte PCM fmt with cbSize=0)
+    keys = [wav_format_key(layout.fmt) for layout in layouts]
+    formats = Counter(keys)
+    if len(formats) > 1:
+        key = formats.most_common(1)[0][0]
+        fmt = layouts[keys.index(key)].fmt
+        offenders = [f"{os.path.basename(audio_file)} ({describe_wav_format(layout.fmt)})"
+                     for audio_file, layout, file_key in zip(audio_files, layouts, keys) if file_key != key]
+        raise ValueError(f"Audio files must all have the same format ({describe_wav_format(fmt)}), "
+                         f"but these differ: {', '.join(offenders)}")
+    
+    return tuple(layouts)
 
-def create_concat_file(audio_files, pattern="AABBAACCDDAA"):
-    """Create a text file for ffmpeg concat demuxer"""
-    # Map pattern letters to file indices based on available files
-    pattern_map = {chr(65 + i): i for i in range(len(audio_files))}  # A=0, B=1, C=2, etc.
+def copy_range(src, dst, offset, length):
+    """Append length bytes of src starting at offset to dst, copying inside the kernel where possible"""
+    src_fd, dst_fd = src.fileno(), dst.fileno()
+    dst.flush()
     
-    concat_list = []
+    # Neither call moves the data through user space; sendfile only accepts a regular file as output on Linux
+    kernel_copies = []
+    if hasattr(os, 'copy_file_range'):
+        kernel_copies.append(lambda count, pos: os.copy_file_range(src_fd, dst_fd, count, pos))
+    if sys.platform.startswith('linux'):
+        kernel_copies.append(lambda count, pos: os.sendfile(dst_fd, src_fd, pos, count))
+    
+    for kernel_copy in kernel_copies:
+        try:
+            while length:
+                copied = kernel_copy(length, offset)
+                if not copied:
+                    break
+                offset += copied
+                length -= copied
+        except OSError as e:
+            # Not supported for this kernel/filesystem pair, try the next method
+            if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                raise
+        if not length:
+            return
+    
+    if offset + length > os.fstat(src_fd).st_size:
+        raise ValueError(f"{os.path.basename(src.name)} ended before its data chunk did")
+    
+    # Hand the mapped segment to a single write(), so the only copy is the kernel's and nothing is buffered here
+    with mmap.mmap(src_fd, 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as source:
+        with source[offset:offset + length] as segment:
+            dst.write(segment)
+
+def compile_pattern(pattern, layouts):
+    """Resolve a pattern into its copy plan of (file index, data offset, data size) segments
+    
+    layouts is the tuple of WavLayout per file from read_wav_layouts.
+    """
+    plan = []
     for char in pattern:
-        if char in pattern_map:
-            file_index = pattern_map[char]
-            concat_list.append(audio_files[file_index])
+        index = ord(char) - 65  # A=0, B=1, C=2, etc.
+        plan.append((index, layouts[index].data_offset, layouts[index].data_size))
+    return tuple(plan)
+
+def splice_wav_files(audio_files, fmt, plan, output_file):
+    """Write the planned data chunks into one WAV, returning its duration in seconds"""
+    data_size = sum(size for _, _, size in plan)
+    header = create_wav_header(fmt, data_size)
+    
+    # The output is preallocated with a valid header, so a failed splice would leave a complete-looking,
+    # zero-filled WAV; write next to it and only move it into place once every segment is copied
+    partial_file = output_file + '.part'
+    try:
+        with ExitStack() as stack:
+            out = stack.enter_context(open(partial_file, 'wb'))
+            
+            # The final size is known, so reserve it up front and let the filesystem lay it out contiguously
+            if hasattr(os, 'posix_fallocate'):
+                try:
+                    os.posix_fallocate(out.fileno(), 0, len(header) + data_size + (data_size & 1))
+                except OSError:
+                    pass  # Not supported by this filesystem, blocks get allocated as we write
+            
+            out.write(header)
+            
+            sources = {}
+            for index, offset, size in plan:
+                if index not in sources:
+                    sources[index] = stack.enter_context(open(audio_files[index], 'rb'))
+                copy_range(sources[index], out, offset, size)
+            
+            if data_size & 1:
+                out.write(b'\0')
+        
+        os.replace(partial_file, output_file)
+    except BaseException:
+        try:
+            os.remove(partial_file)
+        except OSError:
+            pass  # Failed before it was created
+        raise
     
-    # Write concat file
-    concat_filename = "concat_list.txt"
-    with open(concat_filename, 'w') as f:
-        for audio_file in concat_list:
-            f.write(f"file '{audio_file}'\n")
+    return wav_duration(fmt, data_size)
+
+def concatenate_audio(audio_files, jobs, layouts=None):
+    """Concatenate the audio files once per (pattern, output_file) job, splicing WAVs without ffmpeg
     
-    print(f"Created concat list with pattern: {pattern}")
-    print(f"Sequence: {' -> '.join([os.path.basename(audio_files[pattern_map[c]]) for c in pattern])}")
-    print(f"Total segments: {len(pattern)}")
+    layouts comes from read_wav_layouts; without it all jobs are handled by a single ffmpeg process.
     
-    return concat_filename
+    Returns:
+        List of (success, duration in seconds or None if unknown), one per job
+    """
+    results = []
+    
+    if layouts is not None:
+        for pattern, output_file in jobs:
+            try:
+                plan = compile_pattern(pattern, layouts)
+                duration = splice_wav_files(audio_files, layouts[0].fmt, plan, output_file)
+            except (ValueError, OSError) as e:
+                print(f"Error: {e}")
+                results.append((False, None))
+                continue
+            print(f"Success! Created {output_file}")
+            results.append((True, duration))
+        return results
+    
+    if len(jobs) == 1:
+        pattern, output_file = jobs[0]
+        concat_list = create_concat_list(audio_files, pattern)
+        return [concatenate_with_ffmpeg(concat_list, output_file)]
+    return concatenate_with_ffmpeg_filter(audio_files, jobs)
 
-def concatenate_audio(concat_file, output_file="concatenated_audio.wav"):
-    """Use ffmpeg to concatenate the audio files"""
+def concatenate_with_ffmpeg(concat_list, output_file):
+    """Use ffmpeg to concatenate the audio files, returning (success, duration)"""
     cmd = [
         'ffmpeg',
+        '-hide_banner',
+        '-loglevel', 'error',  # Only errors on stderr, nothing to read back on success
         '-f', 'concat',
         '-safe', '0',
-        '-i', concat_file,
+        '-protocol_whitelist', 'pipe,file',
+        '-i', 'pipe:0',  # Concat list arrives on stdin, no temporary file
         '-c', 'copy',  # Copy without re-encoding for speed
+        '-progress', 'pipe:1',  # Report the written duration so no ffprobe run is needed
+        '-nostats',
         '-y',  # Overwrite output file if it exists
         output_file
     ]
@@ -84,23 +306,89 @@ def concatenate_audio(concat_file, output_file="concatenated_audio.wav"):
     print(" ".join(cmd))
     
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        result = subprocess.run(cmd, input=concat_list.encode(), stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
         print(f"Success! Created {output_file}")
-        return True
+        return True, parse_progress_duration(result.stdout.decode())
     except subprocess.CalledProcessError as e:
         print(f"Error running ffmpeg: {e}")
-        print(f"stderr: {e.stderr}")
-        return False
+        print(f"stderr: {e.stderr.decode(errors='replace')}")
+        return False, None
 
-def get_output_info(output_file):
-    """Get information about the output file"""
-    cmd = ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', output_file]
+# PCM codec that holds each decoded sample format (planar or packed) without loss
+PCM_CODECS = {'u8': 'pcm_u8', 's16': 'pcm_s16le', 's32': 'pcm_s32le', 's64': 'pcm_s64le', 'flt': 'pcm_f32le', 'dbl': 'pcm_f64le'}
+
+def pcm_codec_for(audio_file):
+    """Pick the PCM codec that keeps the sample format of audio_file, falling back to 16 bit if it can't be probed"""
+    cmd = [
+        'ffprobe', '-v', 'error',
+        '-select_streams', 'a:0',
+        '-show_entries', 'stream=sample_fmt,bits_per_raw_sample',
+        '-of', 'default=noprint_wrappers=1',
+        audio_file
+    ]
+    try:
+        result = subprocess.run(cmd, stdin=subprocess.DEVNULL, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return 'pcm_s16le'
+    
+    info = dict(line.partition('=')[::2] for line in result.stdout.splitlines())
+    sample_fmt = info.get('sample_fmt', '').rstrip('p')  # e.g. fltp -> flt
+    if sample_fmt == 's32' and info.get('bits_per_raw_sample') == '24':
+        return 'pcm_s24le'  # 24-bit input is decoded into 32-bit samples
+    return PCM_CODECS.get(sample_fmt, 'pcm_s16le')
+
+def concatenate_with_ffmpeg_filter(audio_files, jobs):
+    """Use one ffmpeg process with a concat filter per job, so each input is decoded only once"""
+    pattern_map = {chr(65 + i): i for i in range(len(audio_files))}
+    letters = sorted(set("".join(pattern for pattern, _ in jobs)))
+    input_index = {char: i for i, char in enumerate(letters)}
+    
+    cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-nostats', '-y']
+    for char in letters:
+        cmd += ['-i', audio_files[pattern_map[char]]]
+    
+    graphs = []
+    for k, (pattern, _) in enumerate(jobs):
+        pads = "".join(f"[{input_index[char]}:a]" for char in pattern)
+        graphs.append(f"{pads}concat=n={len(pattern)}:v=0:a=1[out{k}]")
+    cmd += ['-filter_complex', ";".join(graphs)]
+    
+    # The concat filter re-encodes, so write PCM in the inputs' own sample format to stay lossless
+    codec = pcm_codec_for(audio_files[pattern_map[letters[0]]])
+    for k, (_, output_file) in enumerate(jobs):
+        cmd += ['-map', f'[out{k}]', '-c:a', codec, output_file]
+    
+    print(f"Running ffmpeg command:")
+    print(" ".join(cmd))
+    
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        import json
-        info = json.loads(result.stdout)
-        duration = float(info['format']['duration'])
-        size = int(info['format']['size'])
+        subprocess.run(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+        for _, output_file in jobs:
+            print(f"Success! Created {output_file}")
+        return [(True, None)] * len(jobs)
+    except subprocess.CalledProcessError as e:
+        print(f"Error running ffmpeg: {e}")
+        print(f"stderr: {e.stderr.decode(errors='replace')}")
+        return [(False, None)] * len(jobs)
+
+def parse_progress_duration(progress):
+    """Get the final out_time (in seconds) from ffmpeg -progress output"""
+    duration = None
+    for line in progress.splitlines():
+        key, _, value = line.partition('=')
+        # out_time_ms is in microseconds too (long-standing ffmpeg quirk)
+        if key in ('out_time_us', 'out_time_ms') and value.strip().isdigit():
+            duration = int(value) / 1_000_000
+    return duration
+
+def get_output_info(output_file, duration=None):
+    """Print information about the output file, reading its duration from the WAV header if unknown"""
+    try:
+        size = os.stat(output_file).st_size
+        if duration is None:
+            with open(output_file, 'rb') as f:
+                layout = read_wav_layout(f)
+            duration = wav_duration(layout.fmt, layout.data_size)
         print(f"\nOutput file info:")
         print(f"Duration: {duration:.1f} seconds ({duration/60:.1f} minutes)")
         print(f"Size: {size:,} bytes ({size/1024/1024:.1f} MB)")
@@ -109,71 +397,115 @@ def get_output_info(output_file):
         print(f"Could not get output file info: {e}")
         return None
 
-def main():
-    parser = argparse.ArgumentParser(description="Concatenate audio files in custom patterns")
-    parser.add_argument("folder", nargs='?', help="Folder containing audio files (optional)")
-    parser.add_argument("--pattern", "-p", default="AABBAACCDDAA", help="Pattern for concatenation (default: AABBAACCDDAA)")
-    
-    args = parser.parse_args()
-    
-    print("Audio Concatenator - Custom Pattern Support")
-    print("=" * 45)
-    
-    # Get audio files first to know how many we have
-    # Check for folder path
-    folder_path = args.folder
-    if folder_path and not os.path.exists(folder_path):
-        print(f"Error: Folder '{folder_path}' not found!")
-        sys.exit(1)
-    
+def run_one(folder_path, pattern_args):
+    """Concatenate one folder's audio files for every requested pattern, returning True if all succeeded"""
     if folder_path:
         print(f"Using folder: {folder_path}")
     else:
         print("Using current directory")
     
-    # Get audio files
-    audio_files = get_audio_files(folder_path)
+    # Get audio files first to know how many we have
+    try:
+        audio_files = get_audio_files(folder_path)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return False
     print(f"\nFound audio files:")
     for i, file in enumerate(audio_files):
         print(f"  {chr(65+i)} ({i}): {os.path.basename(file)}")
     
-    # Validate and normalize pattern based on available files
+    # Check formats before writing anything; mismatched inputs would splice into garbage
     try:
-        pattern = validate_pattern(args.pattern, len(audio_files))
+        layouts = read_wav_layouts(audio_files)
     except ValueError as e:
         print(f"Error: {e}")
-        sys.exit(1)
-    
-    # Create concat file
-    print(f"\nUsing pattern: {pattern}")
-    concat_file = create_concat_file(audio_files, pattern)
+        return False
     
-    # Generate output filename
-    if folder_path:
-        folder_name = os.path.basename(folder_path.rstrip(os.sep))
-        output_file = f"concatenated_{folder_name}_{pattern}.wav"
-    else:
-        output_file = f"concatenated_{pattern}.wav"
+    # Validate and normalize patterns based on available files
+    try:
+        patterns = [validate_pattern(pattern, len(audio_files)) for pattern in pattern_args]
+    except ValueError as e:
+        print(f"Error: {e}")
+        return False
+    patterns = list(dict.fromkeys(patterns))  # Drop duplicates, they would write the same file
     
-    print(f"\nOutput file: {output_file}")
+    basenames = {chr(65 + i): os.path.basename(file) for i, file in enumerate(audio_files)}
+    jobs = []
+    for pattern in patterns:
+        print(f"\nUsing pattern: {pattern}")
+        print(f"Sequence: {' -> '.join([basenames[c] for c in pattern])}")
+        print(f"Total segments: {len(pattern)}")
+        
+        # Generate output filename
+        if folder_path:
+            folder_name = os.path.basename(folder_path.rstrip(os.sep))
+            output_file = f"concatenated_{folder_name}_{pattern}.wav"
+        else:
+            output_file = f"concatenated_{pattern}.wav"
+        
+        print(f"Output file: {output_file}")
+        jobs.append((pattern, output_file))
     
     # Concatenate
-    success = concatenate_audio(concat_file, output_file)
+    print()
+    results = concatenate_audio(audio_files, jobs, layouts)
     
-    if success:
-        duration = get_output_info(output_file)
-        
-        # Clean up
-        os.remove(concat_file)
-        print(f"Cleaned up temporary file: {concat_file}")
-        
-        print(f"\n✅ Successfully created: {output_file}")
-        print(f"Pattern used: {pattern}")
-        if duration:
-            avg_segment_duration = duration / len(pattern)
-            print(f"Average segment duration: {avg_segment_duration:.1f} seconds")
+    for (pattern, output_file), (success, duration) in zip(jobs, results):
+        if success:
+            duration = get_output_info(output_file, duration)
+            
+            print(f"\n✅ Successfully created: {output_file}")
+            print(f"Pattern used: {pattern}")
+            if duration:
+                avg_segment_duration = duration / len(pattern)
+                print(f"Average segment duration: {avg_segment_duration:.1f} seconds")
+        else:
+            print(f"\n❌ Concatenation failed for pattern {pattern}")
+    
+    return all(success for success, _ in results)
+
+def main():
+    parser = argparse.ArgumentParser(description="Concatenate audio files in custom patterns")
+    parser.add_argument("folders", nargs='*', metavar="folder",
+                        help="Folders containing audio files, processed in parallel (default: current directory)")
+    parser.add_argument("--pattern", "-p", action="append",
+                        help="Pattern for concatenation, repeat for several outputs in one run (default: AABBAACCDDAA)")
+    
+    args = parser.parse_args()
+    
+    print("Audio Concatenator - Custom Pattern Support")
+    print("=" * 45)
+    
+    # Check for folder paths
+    folders = args.folders or [None]
+    for folder_path in folders:
+        if folder_path and not os.path.exists(folder_path):
+            print(f"Error: Folder '{folder_path}' not found!")
+            sys.exit(1)
+        if folder_path and not os.path.isdir(folder_path):
+            print(f"Error: '{folder_path}' is not a folder!")
+            sys.exit(1)
+    
+    # Outputs are named after the folder, so two folders with the same name would write the same files
+    folder_names = Counter(os.path.basename(folder_path.rstrip(os.sep)) for folder_path in folders if folder_path)
+    duplicates = sorted(name for name, count in folder_names.items() if count > 1)
+    if duplicates:
+        print(f"Error: Several folders are named {', '.join(duplicates)}; their output files would overwrite each other")
+        sys.exit(1)
+    
+    pattern_args = args.pattern or ["AABBAACCDDAA"]
+    
+    if len(folders) == 1:
+        results = [run_one(folders[0], pattern_args)]
     else:
-        print("❌ Concatenation failed")
+        # Each folder is an independent job; run them in separate processes
+        with ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, len(folders))) as executor:
+            results = list(executor.map(run_one, folders, repeat(pattern_args)))
+        
+        print(f"\n{results.count(True)}/{len(folders)} folders concatenated successfully")
+    
+    if not all(results):
+        sys.exit(1)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
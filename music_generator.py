@@ -4,21 +4,37 @@ Music Generator Script
 Uses Replicate's musicgen-looper model to generate 4 audio files
 """
 
+from __future__ import annotations
+
 import os
+import shutil
 import sys
-import replicate
-from typing import List, Optional, Tuple
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple, Union
 import time
 import argparse
-import requests
+import functools
+import json
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from itertools import chain, takewhile
 from datetime import datetime
-from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# replicate, requests and dotenv are imported where they are used, so --help and
+# argument errors don't pay for their (substantial) import time
+if TYPE_CHECKING:
+    import requests
+
+# Download progress goes through logging: one handler lock keeps lines from parallel downloads whole
+log = logging.getLogger('musicgen')
 
 def check_replicate_token():
     """Check if REPLICATE_API_TOKEN is set"""
+    # Load environment variables from .env file
+    from dotenv import load_dotenv
+    load_dotenv()
+    
     token = os.getenv('REPLICATE_API_TOKEN')
     if not token:
         print("❌ Error: REPLICATE_API_TOKEN environment variable not set!")
@@ -27,6 +43,145 @@ def check_replicate_token():
         sys.exit(1)
     return token
 
+_client = None
+
+def _get_client():
+    """Return the shared Replicate client, creating it on first use so its connection pool is reused"""
+    global _client
+    if _client is None:
+        import replicate
+        _client = replicate.Client(api_token=os.environ['REPLICATE_API_TOKEN'])
+    return _client
+
+MODEL_VERSION = "f8140d0457c2b39ad8728a80736fea9a67a0ec0cd37b35f40b68cce507db2366"  # andreasjansson/musicgen-looper
+
+@dataclass(frozen=True, slots=True)
+class GenerationConfig:
+    """Generation parameters for musicgen-looper, checked once when built"""
+    prompt: str
+    bpm: int = 120
+    variations: int = 4
+    max_duration: int = 8
+    model_version: str = "medium"
+    temperature: float = 1.0
+    classifier_free_guidance: int = 3
+    output_format: str = "wav"
+    seed: int = -1
+    
+    def __post_init__(self):
+        if not 40 <= self.bpm <= 300:
+            raise ValueError(f"BPM must be between 40 and 300, got {self.bpm}")
+        if not 1 <= self.variations <= 20:
+            raise ValueError(f"Variations must be between 1 and 20, got {self.variations}")
+        if not 2 <= self.max_duration <= 20:
+            raise ValueError(f"Max duration must be between 2 and 20 seconds, got {self.max_duration}")
+    
+    def to_input(self) -> dict:
+        """Model input for Replicate, leaving out the seed when it is random (-1)"""
+        model_input = asdict(self)
+        if self.seed == -1:
+            del model_input['seed']
+        return model_input
+
+DOWNLOAD_MANIFEST = "downloads.json"  # Size and ETag of every completed download in a generation folder
+PREDICTION_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "loop-generator", "predictions")
+
+def _cache_prediction(fetch):
+    """Memoize successful prediction fetches on disk, since a finished prediction's output never changes"""
+    @functools.wraps(fetch)
+    def wrapper(prediction_id: str) -> Tuple[List, str]:
+        # The ID becomes a file name, so only accept plain Replicate IDs (no path separators or '..')
+        if not re.fullmatch(r'[A-Za-z0-9]+', prediction_id):
+            print(f"❌ Invalid prediction ID: {prediction_id!r}")
+            return [], ""
+        
+        cache_file = os.path.join(PREDICTION_CACHE_DIR, f"{prediction_id}.json")
+        try:
+            with open(cache_file) as f:
+                cached = json.load(f)
+            if cached.get('status') == 'succeeded' and cached.get('output'):
+                print(f"💾 Using cached prediction: {prediction_id}")
+                return cached['output'], prediction_id
+        except (OSError, ValueError):
+            pass  # Not cached yet (or unreadable), ask Replicate
+        
+        output, fetched_id = fetch(prediction_id)
+        
+        # Only successful predictions come back with outputs
+        if output:
+            try:
+                payload = json.dumps({"output": output, "status": "succeeded"})
+                os.makedirs(PREDICTION_CACHE_DIR, exist_ok=True)
+                with open(cache_file, 'w') as f:
+                    f.write(payload)
+            except (OSError, TypeError) as e:
+                print(f"⚠️  Could not cache prediction: {e}")
+        
+        return output, fetched_id
+    return wrapper
+
+def _poll_prediction(prediction) -> Iterator:
+    """
+    Yield a prediction, then its refreshed state after each poll until it finishes
+    
+    Polls quickly at first so short predictions are picked up as soon as they finish,
+    then backs off (0.5s up to 5s between polls) so long ones don't hammer the API.
+    
+    Args:
+        prediction: Prediction object from Replicate
+    
+    Yields:
+        The latest state of the prediction
+    """
+    yield prediction
+    delay = 0.5
+    while prediction.status in ['starting', 'processing']:
+        time.sleep(delay)
+        delay = min(delay * 1.5, 5.0)
+        prediction = _get_client().predictions.get(prediction.id)
+        yield prediction
+
+def _wait_for_prediction(prediction):
+    """Poll a running prediction until it finishes and return the finished prediction"""
+    for prediction in _poll_prediction(prediction):
+        pass
+    return prediction
+
+def _stream_outputs(prediction) -> Iterator:
+    """
+    Yield a prediction's audio files as they appear, while the rest are still generating
+    
+    While the prediction runs, only the leading variations that are ready are yielded,
+    so every file keeps the index it has in the final output.
+    
+    Args:
+        prediction: Newly created prediction
+    
+    Yields:
+        URL of each generated audio file, in output order
+    
+    Raises:
+        RuntimeError: If the prediction doesn't succeed
+    """
+    yielded = 0
+    for prediction in _poll_prediction(prediction):
+        outputs = prediction.output or []
+        if isinstance(outputs, dict):
+            outputs = list(outputs.values())
+        
+        if prediction.status == 'succeeded':
+            ready = [o for o in outputs if o is not None]
+        else:
+            ready = list(takewhile(lambda o: o is not None, outputs))
+        
+        yield from ready[yielded:]
+        yielded = max(yielded, len(ready))
+    
+    if prediction.status != 'succeeded':
+        raise RuntimeError(f"prediction {prediction.id} finished with status: {prediction.status}")
+    print(f"✅ Successfully generated {yielded} audio files")
+
+@_cache_prediction
 def get_existing_prediction(prediction_id: str) -> Tuple[List, str]:
     """
     Fetch results from an existing prediction
@@ -41,14 +196,14 @@ def get_existing_prediction(prediction_id: str) -> Tuple[List, str]:
     print(f"🔄 Fetching existing prediction: {prediction_id}")
     
     try:
-        prediction = replicate.predictions.get(prediction_id)
+        prediction = _get_client().predictions.get(prediction_id)
         
         if prediction.status == 'succeeded':
             print(f"✅ Found completed prediction with {len(prediction.output)} audio files")
             return prediction.output, prediction_id
         elif prediction.status in ['starting', 'processing']:
             print(f"⏳ Prediction is still running (status: {prediction.status}), waiting...")
-            prediction.wait()
+            prediction = _wait_for_prediction(prediction)
             if prediction.status == 'succeeded':
                 print(f"✅ Prediction completed with {len(prediction.output)} audio files")
                 return prediction.output, prediction_id
@@ -63,164 +218,295 @@ def get_existing_prediction(prediction_id: str) -> Tuple[List, str]:
         print(f"❌ Error fetching prediction: {e}")
         return [], ""
 
-def generate_music_loop(config: dict) -> Tuple[List, str]:
+def generate_music_loop(config: GenerationConfig) -> Tuple[Iterator, str]:
     """
     Generate music loop using musicgen-looper model
     
+    Starts the prediction and returns straight away; the returned iterator polls it and
+    yields each audio file as soon as it is ready, so downloads overlap with generation.
+    
     Args:
-        config: Dictionary containing all generation parameters
+        config: Generation parameters
     
     Returns:
-        Tuple of (file outputs, prediction_id)
+        Tuple of (iterator over file outputs, prediction_id)
     """
     
-    print(f"🎵 Generating music with prompt: '{config['prompt']}'")
-    print(f"   BPM: {config['bpm']}, Variations: {config['variations']}")
-    print(f"   Max Duration: {config['max_duration']}s, Model: {config['model_version']}")
-    print(f"   Temperature: {config['temperature']}, CFG: {config['classifier_free_guidance']}")
+    print(f"🎵 Generating music with prompt: '{config.prompt}'")
+    print(f"   BPM: {config.bpm}, Variations: {config.variations}")
+    print(f"   Max Duration: {config.max_duration}s, Model: {config.model_version}")
+    print(f"   Temperature: {config.temperature}, CFG: {config.classifier_free_guidance}")
     
     try:
-        # Use replicate.run with specific version hash
-        output = replicate.run(
-            "andreasjansson/musicgen-looper:f8140d0457c2b39ad8728a80736fea9a67a0ec0cd37b35f40b68cce507db2366",
-            input=config
-        )
-        
-        print(f"✅ Successfully generated {len(output)} audio files")
+        # Create the prediction instead of running it, so outputs can be picked up while it runs
+        prediction = _get_client().predictions.create(version=MODEL_VERSION, input=config.to_input())
+        print(f"🚀 Started prediction {prediction.id}")
         
-        # Generate a timestamp-based ID since we don't have prediction ID
+        # New generations are named by timestamp rather than prediction ID
         # Include microseconds for uniqueness
         timestamp_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:17]  # YYYYMMDD_HHMMSS_mmm
         
-        return output, timestamp_id
+        return _stream_outputs(prediction), timestamp_id
         
     except Exception as e:
         print(f"❌ Error generating music: {e}")
         return [], ""
 
-def download_audio_files(file_outputs: List, prediction_id: str, prompt: str = "", config: dict = None) -> Tuple[bool, str]:
+def download_audio_files(file_outputs: Union[List, dict, Iterator], prediction_id: str, prompt: str = "", config: Optional[GenerationConfig] = None) -> Tuple[bool, str, List[str]]:
     """
     Download audio files and save them in organized folders
     
     Args:
-        file_outputs: List of URLs or FileOutput objects from Replicate
+        file_outputs: URLs or FileOutput objects from Replicate, or an iterator
+            yielding them as they are generated
         prediction_id: Prediction ID from Replicate
         prompt: Music prompt used for folder naming
+        config: Generation parameters recorded in the metadata, if known
     
     Returns:
-        Tuple of (success, folder_path)
+        Tuple of (success, folder_path, paths of the files that were downloaded)
     """
     
     if not file_outputs:
-        print("❌ No audio files to download")
-        return False, ""
+        log.error("❌ No audio files to download")
+        return False, "", []
+    
+    # One clock read for the folder name and the metadata
+    now = datetime.now()
     
     # Process the model output
     
     # Handle different output formats
     if isinstance(file_outputs, dict):
-        print(f"🎵 Found {len(file_outputs)} variations: {', '.join(list(file_outputs.keys())[:5])}{'...' if len(file_outputs) > 5 else ''}")
+        log.info(f"🎵 Found {len(file_outputs)} variations: {', '.join(list(file_outputs.keys())[:5])}{'...' if len(file_outputs) > 5 else ''}")
         # Filter out None values and convert to list
         valid_outputs = [v for v in file_outputs.values() if v is not None]
-        print(f"📁 {len(valid_outputs)} variations contain audio files, {len(file_outputs) - len(valid_outputs)} are empty")
+        log.info(f"📁 {len(valid_outputs)} variations contain audio files, {len(file_outputs) - len(valid_outputs)} are empty")
         file_outputs = valid_outputs
+    elif isinstance(file_outputs, Iterator):
+        # Still generating; wait for the first file before creating the folder,
+        # so a prediction that fails outright leaves nothing behind
+        try:
+            first_output = next(file_outputs)
+        except StopIteration:
+            log.error("❌ No audio files to download")
+            return False, "", []
+        except Exception as e:
+            log.error(f"❌ Error generating music: {e}")
+            return False, "", []
+        # The rest are downloaded as they are yielded
+        file_outputs = chain([first_output], file_outputs)
+        log.info("📡 Downloading audio files as they are generated")
     elif hasattr(file_outputs, '__iter__') and not isinstance(file_outputs, str):
         file_outputs = list(file_outputs)
-        print(f"🔍 Processing {len(file_outputs)} files from iterable")
+        log.info(f"🔍 Processing {len(file_outputs)} files from iterable")
     else:
-        print(f"❌ Unexpected file_outputs format: {type(file_outputs)}")
-        return False, ""
+        log.error(f"❌ Unexpected file_outputs format: {type(file_outputs)}")
+        return False, "", []
     
     # Create folder name using prediction ID or timestamp as fallback
     if prediction_id:
         # Use first 16 chars to accommodate longer timestamp format
         folder_name = f"generation_{prediction_id[:16]}"
     else:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:17]
+        timestamp = now.strftime("%Y%m%d_%H%M%S_%f")[:17]
         folder_name = f"generation_{timestamp}"
     
     # Create the folder
     try:
         os.makedirs(folder_name, exist_ok=True)
-        print(f"📁 Created folder: {folder_name}")
+        log.info(f"📁 Created folder: {folder_name}")
     except Exception as e:
-        print(f"❌ Error creating folder: {e}")
-        return False, ""
+        log.error(f"❌ Error creating folder: {e}")
+        return False, "", []
     
-    print(f"📥 Downloading all {len(file_outputs)} audio files...")
+    if isinstance(file_outputs, list):
+        log.info(f"📥 Downloading all {len(file_outputs)} audio files...")
     
-    success_count = 0
     base_name = "replicate-prediction-ey6ew4zgddrj40cqqkcr4xnt0m"
+    max_workers = 16
+    
+    # Files finished by an earlier run, so reruns only skip downloads known to be complete
+    manifest_file = os.path.join(folder_name, DOWNLOAD_MANIFEST)
+    try:
+        with open(manifest_file) as f:
+            completed = json.load(f)
+    except (OSError, ValueError):
+        completed = {}
     
-    for i, file_output in enumerate(file_outputs):
-        filename = f"{base_name}-{i}.wav"
-        filepath = os.path.join(folder_name, filename)
+    import requests
+    from requests.adapters import HTTPAdapter
+    
+    # One session for every file, so connections (and TLS handshakes) to the CDN are reused
+    futures = []
+    generation_error = None
+    with requests.Session() as session:
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
         
-        try:
-            print(f"   Downloading {filepath}...")
-            
-            # Handle both URL strings and FileOutput objects
-            if isinstance(file_output, str):
-                # It's a URL string, download it
-                response = requests.get(file_output, stream=True)
-                response.raise_for_status()
-                audio_data = response.content
-            else:
-                # It's a FileOutput object, read it
-                audio_data = file_output.read()
-            
-            # Write to file
-            with open(filepath, 'wb') as f:
-                f.write(audio_data)
-            
-            # Check file size
-            file_size = os.path.getsize(filepath)
-            print(f"   ✅ {filepath} saved ({file_size:,} bytes)")
-            success_count += 1
-            
-        except Exception as e:
-            print(f"   ❌ Error downloading {filepath}: {e}")
+        # Downloads are independent and I/O-bound, so run them on a thread pool instead of one after another
+        # (the pool only starts threads as files are submitted)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                for i, file_output in enumerate(file_outputs):
+                    filepath = os.path.join(folder_name, f"{base_name}-{i}.wav")
+                    record = completed.get(os.path.basename(filepath))
+                    futures.append((filepath, executor.submit(_download_one, session, file_output, filepath, record)))
+            except Exception as e:
+                # Generation failed part way; let the downloads already started finish
+                log.error(f"❌ Error generating music: {e}")
+                generation_error = e
+    results = [(filepath, future.result()) for filepath, future in futures]
+    downloaded = [filepath for filepath, record in results if record]
+    success_count = len(downloaded)
+    total_files = len(futures)
+    
+    # Record what finished for the next rerun
+    completed.update((os.path.basename(filepath), record) for filepath, record in results if record)
+    try:
+        with open(manifest_file, 'w') as f:
+            f.write(json.dumps(completed, indent=2))
+    except OSError as e:
+        log.warning(f"   ⚠️  Could not save download records: {e}")
     
     # Save metadata
     try:
         metadata_file = os.path.join(folder_name, "metadata.txt")
+        lines = [
+            f"Prediction ID: {prediction_id}",
+            f"Prompt: {prompt}",
+            f"Generated: {now.isoformat()}",
+            f"Files downloaded: {success_count}",
+            f"Total files from prediction: {total_files}",
+        ]
+        
+        # Add configuration details if available
+        if config:
+            lines += [
+                "",
+                "Generation Parameters:",
+                f"  BPM: {config.bpm}",
+                f"  Variations: {config.variations}",
+                f"  Max Duration: {config.max_duration}s",
+                f"  Model Version: {config.model_version}",
+                f"  Temperature: {config.temperature}",
+                f"  CFG Scale: {config.classifier_free_guidance}",
+                f"  Output Format: {config.output_format}",
+            ]
+            if config.seed != -1:
+                lines.append(f"  Seed: {config.seed}")
+        
+        # One write for the whole file
         with open(metadata_file, 'w') as f:
-            f.write(f"Prediction ID: {prediction_id}\n")
-            f.write(f"Prompt: {prompt}\n")
-            f.write(f"Generated: {datetime.now().isoformat()}\n")
-            f.write(f"Files downloaded: {success_count}\n")
-            f.write(f"Total files from prediction: {len(file_outputs)}\n")
-            
-            # Add configuration details if available
-            if config:
-                f.write(f"\nGeneration Parameters:\n")
-                f.write(f"  BPM: {config.get('bpm', 'N/A')}\n")
-                f.write(f"  Variations: {config.get('variations', 'N/A')}\n")
-                f.write(f"  Max Duration: {config.get('max_duration', 'N/A')}s\n")
-                f.write(f"  Model Version: {config.get('model_version', 'N/A')}\n")
-                f.write(f"  Temperature: {config.get('temperature', 'N/A')}\n")
-                f.write(f"  CFG Scale: {config.get('classifier_free_guidance', 'N/A')}\n")
-                f.write(f"  Output Format: {config.get('output_format', 'N/A')}\n")
-                if config.get('seed', -1) != -1:
-                    f.write(f"  Seed: {config.get('seed')}\n")
-                
-        print(f"   📄 Metadata saved to {metadata_file}")
+            f.write("\n".join(lines) + "\n")
+        
+        log.info(f"   📄 Metadata saved to {metadata_file}")
     except Exception as e:
-        print(f"   ⚠️  Could not save metadata: {e}")
+        log.warning(f"   ⚠️  Could not save metadata: {e}")
     
-    if success_count == len(file_outputs):
-        print(f"🎉 All {success_count} files downloaded successfully!")
-        return True, folder_name
+    if generation_error is not None:
+        log.warning(f"⚠️  Generation failed after {total_files} files, {success_count} downloaded")
+        return False, folder_name, downloaded
+    elif total_files and success_count == total_files:
+        log.info(f"🎉 All {success_count} files downloaded successfully!")
+        return True, folder_name, downloaded
     else:
-        print(f"⚠️  Only {success_count}/{len(file_outputs)} files downloaded successfully")
-        return False, folder_name
+        log.warning(f"⚠️  Only {success_count}/{total_files} files downloaded successfully")
+        return False, folder_name, downloaded
+
+def _is_already_downloaded(session: requests.Session, url: str, filepath: str, record: Optional[dict]) -> bool:
+    """Check whether a completed download of url is still at filepath, comparing its record with a HEAD request"""
+    import requests
+    
+    if not record or not os.path.exists(filepath) or os.path.getsize(filepath) != record['size']:
+        return False
+    
+    try:
+        head = session.head(url, allow_redirects=True, timeout=30)
+    except requests.RequestException:
+        return False
+    if not head.ok:
+        return False
+    
+    # Loops of the same length and format all have the same size, so prefer the ETag when both sides have one
+    etag = head.headers.get('ETag')
+    if etag and record.get('etag'):
+        return etag == record['etag']
+    content_length = head.headers.get('Content-Length')
+    return content_length is not None and int(content_length) == record['size']
+
+def _download_one(session: requests.Session, file_output, filepath: str, record: Optional[dict] = None) -> Optional[dict]:
+    """
+    Download a single audio file
+    
+    Args:
+        session: Shared HTTP session used for URL downloads
+        file_output: URL string or FileOutput object from Replicate
+        filepath: Where to save the file
+        record: Record of an earlier completed download of this file, if any
+    
+    Returns:
+        Record of the completed download (size and ETag), or None if it failed
+    """
+    # Write next to the destination and move it into place only once complete, so an
+    # interrupted download never leaves a file that looks finished
+    partpath = filepath + '.part'
+    try:
+        # Reruns (e.g. with --prediction-id) find the same bytes already on disk
+        url = file_output if isinstance(file_output, str) else getattr(file_output, 'url', None)
+        if url and _is_already_downloaded(session, url, filepath, record):
+            log.info(f"   ⏭️  {filepath} already downloaded ({record['size']:,} bytes), skipping")
+            return record
+        
+        log.debug(f"   Downloading {filepath}...")
+        
+        # Handle both URL strings and FileOutput objects
+        etag = None
+        if isinstance(file_output, str):
+            # It's a URL string, stream it to disk as it arrives instead of buffering the whole file
+            with session.get(file_output, stream=True, timeout=30) as response:
+                response.raise_for_status()
+                etag = response.headers.get('ETag')
+                # Copy straight from the raw urllib3 stream, skipping iter_content's per-chunk generator
+                response.raw.decode_content = True
+                with open(partpath, 'wb', buffering=1024 * 1024) as f:
+                    # Reserve the whole file up front so the filesystem can allocate it contiguously
+                    content_length = response.headers.get('Content-Length')
+                    if content_length and hasattr(os, 'posix_fallocate'):
+                        try:
+                            os.posix_fallocate(f.fileno(), 0, int(content_length))
+                        except OSError:
+                            pass  # Not supported by this filesystem
+                    shutil.copyfileobj(response.raw, f, length=128 * 1024)
+                    if content_length and response.raw.tell() != int(content_length):
+                        raise IOError(f"connection closed after {response.raw.tell():,} of {int(content_length):,} bytes")
+                    f.truncate()  # Drop any reserved space a decoded body didn't fill
+        else:
+            # It's a FileOutput object; iterating it streams the body in chunks instead of read()ing it all at once
+            with open(partpath, 'wb', buffering=1024 * 1024) as f:
+                for chunk in file_output:
+                    f.write(chunk)
+        
+        os.replace(partpath, filepath)
+        
+        # Check file size
+        file_size = os.path.getsize(filepath)
+        log.info(f"   ✅ {filepath} saved ({file_size:,} bytes)")
+        return {"size": file_size, "etag": etag}
+        
+    except Exception as e:
+        log.error(f"   ❌ Error downloading {filepath}: {e}")
+        try:
+            os.remove(partpath)
+        except OSError:
+            pass  # Failed before anything was written
+        return None
 
 def get_file_info(filepath: str):
     """Get basic info about a downloaded file"""
-    if os.path.exists(filepath):
-        size = os.path.getsize(filepath)
-        return f"{filepath}: {size:,} bytes ({size/1024/1024:.1f} MB)"
-    return f"{filepath}: File not found"
+    size = os.path.getsize(filepath)
+    return f"{filepath}: {size:,} bytes ({size/1024/1024:.1f} MB)"
 
 def main():
     parser = argparse.ArgumentParser(description="Generate music using Replicate musicgen-looper")
@@ -237,6 +523,8 @@ def main():
     
     args = parser.parse_args()
     
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
+    
     print("🎼 Music Generator using Replicate musicgen-looper")
     print("=" * 50)
     
@@ -269,32 +557,33 @@ def main():
                 print(f"Invalid BPM, using default {bpm}")
         
         # Build configuration from args
-        config = {
-            "prompt": prompt,
-            "bpm": bpm,
-            "variations": args.variations,
-            "max_duration": args.max_duration,
-            "model_version": args.model_version,
-            "temperature": args.temperature,
-            "classifier_free_guidance": args.classifier_free_guidance,
-            "output_format": args.output_format
-        }
-        
-        # Add seed if specified
-        if args.seed != -1:
-            config["seed"] = args.seed
+        try:
+            config = GenerationConfig(
+                prompt=prompt,
+                bpm=bpm,
+                variations=args.variations,
+                max_duration=args.max_duration,
+                model_version=args.model_version,
+                temperature=args.temperature,
+                classifier_free_guidance=args.classifier_free_guidance,
+                output_format=args.output_format,
+                seed=args.seed,
+            )
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
         
         print(f"\nConfiguration:")
-        print(f"  Prompt: {config['prompt']}")
-        print(f"  BPM: {config['bpm']}")
-        print(f"  Variations: {config['variations']}")
-        print(f"  Max Duration: {config['max_duration']}s")
-        print(f"  Model Version: {config['model_version']}")
-        print(f"  Temperature: {config['temperature']}")
-        print(f"  CFG Scale: {config['classifier_free_guidance']}")
-        print(f"  Output Format: {config['output_format']}")
-        if args.seed != -1:
-            print(f"  Seed: {config['seed']}")
+        print(f"  Prompt: {config.prompt}")
+        print(f"  BPM: {config.bpm}")
+        print(f"  Variations: {config.variations}")
+        print(f"  Max Duration: {config.max_duration}s")
+        print(f"  Model Version: {config.model_version}")
+        print(f"  Temperature: {config.temperature}")
+        print(f"  CFG Scale: {config.classifier_free_guidance}")
+        print(f"  Output Format: {config.output_format}")
+        if config.seed != -1:
+            print(f"  Seed: {config.seed}")
     
     print()
     
@@ -312,60 +601,56 @@ def main():
         example_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:17]
         print(f"   (New generations use format: generation_{example_timestamp})")
     else:
-        # Generate new music
+        # Generate new music; files come back as they are generated
         file_outputs, prediction_id = generate_music_loop(config)
         if not file_outputs:
             print("❌ Failed to generate music files")
             sys.exit(1)
-        
-        generation_time = time.time() - start_time
-        print(f"⏱️  Generation took {generation_time:.1f} seconds")
     
-    # Download files
-    prompt_for_folder = config['prompt'] if config else "reused_prediction"
-    success, folder_path = download_audio_files(file_outputs, prediction_id, prompt_for_folder, config)
+    # Download files (for new generations this runs alongside the generation itself)
+    prompt_for_folder = config.prompt if config else "reused_prediction"
+    success, folder_path, downloaded = download_audio_files(file_outputs, prediction_id, prompt_for_folder, config)
+    
+    if not args.prediction_id:
+        generation_time = time.time() - start_time
+        print(f"⏱️  Generation and download took {generation_time:.1f} seconds")
     
     if success:
         print(f"\n📊 File Summary:")
-        base_name = "replicate-prediction-ey6ew4zgddrj40cqqkcr4xnt0m"
         
         # Show all downloaded files to understand the structure
-        files_found = []
-        for filename in os.listdir(folder_path):
-            if filename.startswith(base_name) and filename.endswith('.wav'):
-                filepath = os.path.join(folder_path, filename)
-                files_found.append(filename)
-                print(f"  {get_file_info(filepath)}")
+        for filepath in downloaded:
+            print(f"  {get_file_info(filepath)}")
         
         print(f"\n🎯 Analysis:")
-        print(f"   Total files downloaded: {len(files_found)}")
+        print(f"   Total files downloaded: {len(downloaded)}")
         print(f"   Folder: {folder_path}/")
         
-        if len(files_found) >= 4:
-            print(f"   ✅ {len(files_found)} files ready for concatenation")
+        if len(downloaded) >= 4:
+            print(f"   ✅ {len(downloaded)} files ready for concatenation")
             print(f"   Basic usage: python audio_concatenator.py {folder_path}")
             print(f"   Custom pattern: python audio_concatenator.py {folder_path} --pattern 'YOUR_PATTERN'")
             
             # Show pattern examples based on number of files
-            if len(files_found) >= 8:
+            if len(downloaded) >= 8:
                 print(f"   Example patterns: ABCDEFGH, AABBCCDDEEFFGGHH, ABCDEFAGFSADGAS")
-            elif len(files_found) >= 6:
+            elif len(downloaded) >= 6:
                 print(f"   Example patterns: ABCDEF, AABBCCDDEEFF, ABACADCFCEC")
             else:
                 print(f"   Example patterns: AABBAACCDDAA, ABCDABCD, ABACADABACAD")
             
             # Estimate total duration based on max_duration if available
             if config:
-                print(f"\n💡 With {config['max_duration']}s loops and default pattern (12 segments):")
-                estimated_duration = config['max_duration'] * 12
+                print(f"\n💡 With {config.max_duration}s loops and default pattern (12 segments):")
+                estimated_duration = config.max_duration * 12
                 print(f"   Total duration: ~{estimated_duration} seconds ({estimated_duration/60:.1f} minutes)")
-                print(f"   Custom patterns: duration = {config['max_duration']}s × pattern_length")
+                print(f"   Custom patterns: duration = {config.max_duration}s × pattern_length")
             else:
                 print(f"\n💡 With ~8s loops and default pattern (12 segments):")
                 print(f"   Total duration: ~96 seconds (1.6 minutes)")
                 print(f"   Custom patterns: duration = 8s × pattern_length")
         else:
-            print(f"   ⚠️  Only {len(files_found)} files found (concatenator works best with 4+)")
+            print(f"   ⚠️  Only {len(downloaded)} files found (concatenator works best with 4+)")
         
     else:
         print("❌ Some files failed to download")